@@ -7,7 +7,7 @@ from .node_utilities import ResolutionPacker, ResolutionProperties, AspectRatioP
 from .node_advisor import ResolutionAdvisor
 from .node_qwen import QwenImageNativesResolutions
 from .node_fluxreport import FluxReport
-from .node_images import LoadImage
+from .node_images import LoadImage, ResizeImage, SaveImage
 
 
 class IG1ToolsExtension(ComfyExtension):
@@ -22,9 +22,14 @@ class IG1ToolsExtension(ComfyExtension):
             QwenImageNativesResolutions,
             FluxReport,
             LoadImage,
+            ResizeImage,
+            SaveImage,
         ]
 
 
+WEB_DIRECTORY = "./web/js"
+
+
 async def comfy_entrypoint() -> IG1ToolsExtension:
     return IG1ToolsExtension()
 
@@ -1,29 +1,155 @@
-import os
+import asyncio
+import hashlib
+import json
+from functools import lru_cache
 from aiohttp import web
-from folder_paths import get_directory_by_type
 from server import PromptServer
 
+from .helpers import HIRES_RATIO, Resolution
+from .image_listing import listings
+from .image_watcher import EVENT_TYPE, start_watchers
+from .node_advisor import advise, models
+
 routes = PromptServer.instance.routes
 
+# Plans are computed off the event loop but a non cached entry can take ~20ms (FLUX.2 table sort)
+ADVISE_MAX_ENTRIES = 64
+ADVISE_MAX_LEN = 16384
+
 
 @routes.get("/ig1api/images")
 async def get_images(request: web.Request) -> web.Response:
-    input_dir = get_directory_by_type("input")
-    input_images = sorted(
-        (entry for entry in os.scandir(input_dir) if entry.is_file()),
-        key=lambda entry: -entry.stat().st_mtime
-    )
-    input_names = [entry.name for entry in input_images]
-
-    output_dir = get_directory_by_type("output")
-    output_images = sorted(
-        (entry for entry in os.scandir(output_dir) if entry.is_file()),
-        key=lambda entry: -entry.stat().st_mtime
-    )
-    output_names = [entry.name + " [output]" for entry in output_images]
+    # Cached listings, only rescanned when a directory changed behind our back
+    input_names = listings["input"].names()
+    output_names = [name + " [output]" for name in listings["output"].names()]
 
     return web.json_response(input_names + output_names, status=200)
 
 
+@lru_cache(maxsize=4096)
+def get_plan(model: str, width: int, height: int, snap_to_native: bool) -> dict:
+    generate, need_hires, need_upscale = advise(
+        Resolution(width, height), model, snap_to_native)
+    return {
+        "model": model,
+        "width": width,
+        "height": height,
+        "snap_to_native": snap_to_native,
+        "generate": {"width": generate.width, "height": generate.height},
+        "need_hires": need_hires,
+        "hires": {"width": generate.width * HIRES_RATIO, "height": generate.height * HIRES_RATIO} if need_hires else None,
+        "need_upscale": need_upscale,
+    }
+
+
+def parse_advise_entry(entry) -> tuple[str, int, int, bool]:
+    if not isinstance(entry, dict):
+        raise ValueError("each entry must be an object")
+    model = entry.get("model")
+    if model not in models:
+        raise ValueError(f"unknown model {model!r}, expected one of {models}")
+    width = entry.get("width")
+    height = entry.get("height")
+    for name, value in (("width", width), ("height", height)):
+        if not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= ADVISE_MAX_LEN:
+            raise ValueError(f"{name} must be an integer between 1 and {ADVISE_MAX_LEN}")
+    snap_to_native = entry.get("snap_to_native", False)
+    if not isinstance(snap_to_native, bool):
+        raise ValueError("snap_to_native must be a boolean")
+    return model, width, height, snap_to_native
+
+
+def parse_query_bool(value: str) -> bool:
+    if value.lower() in ("1", "true", "yes"):
+        return True
+    if value.lower() in ("0", "false", "no", ""):
+        return False
+    raise ValueError("snap_to_native must be a boolean")
+
+
+def parse_query_entries(query) -> list[dict]:
+    # Batches are sent as repeated model, width, height (and optional snap_to_native) parameters
+    query_models = query.getall("model", [])
+    widths = query.getall("width", [])
+    heights = query.getall("height", [])
+    snaps = query.getall("snap_to_native", [])
+    if not query_models or len(widths) != len(query_models) or len(heights) != len(query_models):
+        raise ValueError("model, width and height must be given the same number of times")
+    if snaps and len(snaps) != len(query_models):
+        raise ValueError("snap_to_native must be given for every entry or none")
+    entries = []
+    for index, model in enumerate(query_models):
+        try:
+            width, height = int(widths[index]), int(heights[index])
+        except ValueError:
+            raise ValueError(f"entry {index}: width and height must be integers")
+        entries.append({
+            "model": model,
+            "width": width,
+            "height": height,
+            "snap_to_native": parse_query_bool(snaps[index]) if snaps else False,
+        })
+    return entries
+
+
+def compute_plans(entries) -> list[dict]:
+    if not isinstance(entries, list):
+        raise ValueError("body must be a list of {model, width, height} objects")
+    if len(entries) > ADVISE_MAX_ENTRIES:
+        raise ValueError(f"at most {ADVISE_MAX_ENTRIES} entries per request")
+    plans = []
+    for index, entry in enumerate(entries):
+        try:
+            plans.append(get_plan(*parse_advise_entry(entry)))
+        except ValueError as e:
+            raise ValueError(f"entry {index}: {e}")
+    return plans
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in tags or "*" in tags
+
+
+@routes.get("/ig1api/advise")
+async def get_advise(request: web.Request) -> web.Response:
+    try:
+        entries = parse_query_entries(request.query)
+        plans = await asyncio.get_running_loop().run_in_executor(None, compute_plans, entries)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    # Plans only depend on the query: cacheable, and revalidated with the ETag once stale
+    body = json.dumps(plans, separators=(",", ":"))
+    etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=3600",
+    }
+    if etag_matches(etag, request.headers.get("If-None-Match", "")):
+        return web.Response(status=304, headers=headers)
+    return web.Response(text=body, content_type="application/json", headers=headers, status=200)
+
+
+@routes.post("/ig1api/advise")
+async def post_advise(request: web.Request) -> web.Response:
+    # Uncached batch form for bodies too big for a query string, use GET for cacheable queries
+    headers = {"Cache-Control": "no-store"}
+    try:
+        entries = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return web.json_response({"error": "invalid JSON body"}, status=400, headers=headers)
+    try:
+        plans = await asyncio.get_running_loop().run_in_executor(None, compute_plans, entries)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400, headers=headers)
+    return web.json_response(plans, status=200, headers=headers)
+
+
+def send_images_changes(message: dict):
+    # Thread safe, called from the watchers threads
+    PromptServer.instance.send_sync(EVENT_TYPE, message)
+
+
 def run_api_server():
+    start_watchers(send_images_changes)
     print("IG1 API Server started")
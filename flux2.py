@@ -1,4 +1,6 @@
-from .helpers import Resolution, generate_all_valid_resolutions
+from functools import cache
+
+from .helpers import COMMON_ASPECT_RATIOS, Resolution, ResolutionsIndex, ResolutionsList, generate_all_valid_resolutions, generate_ratio_buckets
 
 PATCH_LEN = 16
 MIN_LEN = 400  # is and must be dividable by PATCH_LEN
@@ -7,9 +9,15 @@ MIN_LEN = 400  # is and must be dividable by PATCH_LEN
 MAX_SIZE = 2000000
 
 
-# Precompute all valid resolutions
-all_valid_resolutions = generate_all_valid_resolutions(
-    PATCH_LEN, MIN_LEN, MAX_SIZE)
+# All valid resolutions, only computed on first use to keep startup fast
+@cache
+def get_all_valid_resolutions() -> ResolutionsList:
+    return generate_all_valid_resolutions(PATCH_LEN, MIN_LEN, MAX_SIZE)
+
+
+# BFL did not publish FLUX.2 training buckets, derive them from common ratios at the deduced training size
+native_resolutions = ResolutionsIndex(generate_ratio_buckets(
+    COMMON_ASPECT_RATIOS, PATCH_LEN, MIN_LEN, MAX_SIZE))
 
 
 def get_best_valid_resolution(res: Resolution) -> Resolution:
@@ -17,4 +25,9 @@ def get_best_valid_resolution(res: Resolution) -> Resolution:
     if res.valid(patch_len=PATCH_LEN, min_len=MIN_LEN, max_size=MAX_SIZE):
         return res
     # Find the best one
-    return all_valid_resolutions.get_best_candidate(res)
+    return get_all_valid_resolutions().get_best_candidate(res)
+
+
+def get_native_resolution(res: Resolution) -> Resolution:
+    # Snap to the trained resolution with the nearest aspect ratio
+    return native_resolutions.get_nearest_ratio(res)
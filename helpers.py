@@ -1,8 +1,11 @@
 # pylint: disable=missing-module-docstring,disable=missing-class-docstring,missing-function-docstring,line-too-long
+import bisect
 import math
-from typing import List
+from typing import Callable, Dict, List, Optional, Tuple
 
 HIRES_RATIO = 2
+# Weight of the lost pixels share against the aspect ratio error when planning buckets
+BUCKET_SIZE_LOSS_WEIGHT = 1.0
 
 
 def euclidean_distance(a: List[float], b: List[float]) -> float:
@@ -67,6 +70,14 @@ class Resolution:
     def __str__(self) -> str:
         return f"{self.width}×{self.height} ({self.aspect_ratio()} @ {self.mega_pixels()}MP)"
 
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Resolution):
+            return False
+        return self.width == other.width and self.height == other.height
+
+    def __hash__(self) -> int:
+        return hash((self.width, self.height))
+
 
 def ratio_distance(ref: AspectRatio, candidate: AspectRatio) -> float:
     return abs(ref.value() - candidate.value())
@@ -169,3 +180,160 @@ def generate_all_valid_resolutions(patch_len: int, min_len: int, max_size: int)
             valid_resolutions.append(Resolution(width, height))
 
     return ResolutionsList(valid_resolutions)
+
+
+# Landscape, square and portrait ratios used to derive bucket lists for models without a published one
+COMMON_ASPECT_RATIOS = [
+    AspectRatio(1, 1),
+    AspectRatio(5, 4), AspectRatio(4, 5),
+    AspectRatio(4, 3), AspectRatio(3, 4),
+    AspectRatio(3, 2), AspectRatio(2, 3),
+    AspectRatio(16, 9), AspectRatio(9, 16),
+    AspectRatio(21, 9), AspectRatio(9, 21),
+]
+
+
+def generate_ratio_buckets(ratios: List[AspectRatio], patch_len: int, min_len: int, max_size: int) -> List[Resolution]:
+    # For each ratio, the biggest resolution respecting patch len, min len and max size with the closest possible ratio
+    buckets = []
+    for ratio in ratios:
+        best = None
+        width = patch_len * max(1, min_len // patch_len)
+        while width * min_len <= max_size:
+            height = max(min_len, round(width / ratio.value() / patch_len) * patch_len)
+            candidate = Resolution(width, height)
+            if candidate.total_pixels() <= max_size and (best is None or (
+                    ratio_distance(ratio, candidate.aspect_ratio()), -candidate.total_pixels()) < (
+                    ratio_distance(ratio, best.aspect_ratio()), -best.total_pixels())):
+                best = candidate
+            width += patch_len
+        if best is not None and best not in buckets:
+            buckets.append(best)
+    return buckets
+
+
+class ResolutionsIndex:
+    def __init__(self, resolutions: List[Resolution]):
+        self.resolutions = resolutions
+        # Hashed lookups by string representation (combo values) and by size
+        self.by_name = {str(res): res for res in resolutions}
+        self.by_size = set(resolutions)
+        # Sorted aspect ratio values for nearest ratio searches
+        self.by_ratio = sorted(resolutions, key=lambda res: res.aspect_ratio().value())
+        self.ratios = [res.aspect_ratio().value() for res in self.by_ratio]
+
+    def get(self, name: str) -> Optional[Resolution]:
+        return self.by_name.get(name)
+
+    def get_nearest_ratio(self, target: Resolution) -> Resolution:
+        if not self.resolutions:
+            return Resolution(0, 0)
+        # Binary search the target ratio, the nearest ratio is one of the two neighbours
+        target_ratio = target.aspect_ratio().value()
+        index = bisect.bisect_left(self.ratios, target_ratio)
+        neighbours = [i for i in (index - 1, index) if 0 <= i < len(self.ratios)]
+        nearest = min(neighbours, key=lambda i: abs(self.ratios[i] - target_ratio))
+        # Gather all the resolutions sharing this ratio and pick the closest in size
+        nearest_ratio = self.ratios[nearest]
+        low = bisect.bisect_left(self.ratios, nearest_ratio)
+        high = bisect.bisect_right(self.ratios, nearest_ratio)
+        return ResolutionsList(self.by_ratio[low:high]).get_closest_equal_or_larger(target)
+
+    def __contains__(self, res: Resolution) -> bool:
+        return res in self.by_size
+
+    def __iter__(self):
+        return iter(self.resolutions)
+
+    def __len__(self) -> int:
+        return len(self.resolutions)
+
+    def __str__(self):
+        return str([str(res) for res in self.resolutions])
+
+
+class BucketAssignment:
+    def __init__(self, target: Resolution, generate: Resolution):
+        self.target = target
+        self.generate = generate
+        # Largest centered region of the generate resolution sharing the target aspect ratio
+        target_ratio = target.width / target.height
+        if generate.width / generate.height > target_ratio:
+            crop = Resolution(round(generate.height * target_ratio), generate.height)
+        else:
+            crop = Resolution(generate.width, round(generate.width / target_ratio))
+        self.crop = crop
+        self.crop_x = (generate.width - crop.width) // 2
+        self.crop_y = (generate.height - crop.height) // 2
+
+    def need_crop(self) -> bool:
+        return self.crop.width != self.generate.width or self.crop.height != self.generate.height
+
+    def stretch(self) -> Tuple[float, float]:
+        # Per axis scale factors to go from the generate resolution to the exact target
+        return self.target.width / self.generate.width, self.target.height / self.generate.height
+
+    def __str__(self) -> str:
+        return f"{self.target.width}×{self.target.height} -> {self.generate} (crop {self.crop.width}×{self.crop.height}+{self.crop_x}+{self.crop_y})"
+
+
+def plan_buckets(targets: List[Resolution], max_buckets: int, resolver: Callable[[Resolution], Resolution]) -> List[BucketAssignment]:
+    if not targets:
+        return []
+    if max_buckets < 1:
+        raise ValueError(f"max_buckets must be at least 1, got {max_buckets}")
+    # Each target best generate resolution is a bucket candidate, keyed by size to deduplicate them
+    preferred = [resolver(target) for target in targets]
+    candidates: Dict[Tuple[int, int], Resolution] = {}
+    for res in preferred:
+        candidates.setdefault((res.width, res.height), res)
+    target_ratios = [target.aspect_ratio() for target in targets]
+
+    def costs_for(bucket: Resolution) -> List[float]:
+        # Aspect ratio error plus the share of pixels lost compared to the target preferred resolution,
+        # so a single odd ratio target can not drag the others to a tiny generate resolution.
+        bucket_ratio = bucket.aspect_ratio()
+        return [
+            ratio_distance(ratio, bucket_ratio) + BUCKET_SIZE_LOSS_WEIGHT *
+            max(0.0, 1 - bucket.total_pixels() / own.total_pixels())
+            for ratio, own in zip(target_ratios, preferred)
+        ]
+
+    candidates_costs = {key: costs_for(res) for key, res in candidates.items()}
+    popularity: Dict[Tuple[int, int], int] = {}
+    for res in preferred:
+        popularity[(res.width, res.height)] = popularity.get((res.width, res.height), 0) + 1
+
+    # Greedy selection: keep adding the bucket reducing the most the total cost.
+    # Ties are broken toward the bigger bucket, then the number of targets preferring it.
+    selected: List[Tuple[int, int]] = []
+    best_costs = [math.inf] * len(targets)
+    while len(selected) < max_buckets:
+        current_total = sum(best_costs)
+        best_key = None
+        best_rank = None
+        for key, costs in candidates_costs.items():
+            if key in selected:
+                continue
+            total = sum(min(current, cost) for current, cost in zip(best_costs, costs))
+            if total >= current_total:
+                continue
+            rank = (total, -candidates[key].total_pixels(), -popularity[key])
+            if best_rank is None or rank < best_rank:
+                best_key = key
+                best_rank = rank
+        if best_key is None:
+            # No remaining candidate lowers the cost: less buckets means bigger batches
+            break
+        selected.append(best_key)
+        best_costs = [min(current, cost) for current, cost in zip(best_costs, candidates_costs[best_key])]
+
+    # Assign each target to its lowest cost bucket, the bigger one on ties
+    assignments = []
+    for index, target in enumerate(targets):
+        key = min(selected, key=lambda key: (
+            candidates_costs[key][index],
+            -candidates[key].total_pixels(),
+        ))
+        assignments.append(BucketAssignment(target, candidates[key]))
+    return assignments
@@ -0,0 +1,120 @@
+# pylint: disable=missing-module-docstring,disable=missing-class-docstring,missing-function-docstring,line-too-long
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from folder_paths import get_directory_by_type
+
+# Suffix of the temporary files written before the atomic rename, never listed
+TEMP_SUFFIX = ".ig1tmp"
+
+
+def directory_stamp(directory: str) -> Optional[int]:
+    try:
+        return os.stat(directory).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+class DirectoryListing:
+    def __init__(self, folder_type: str):
+        self.folder_type = folder_type
+        self.lock = threading.Lock()
+        # File name -> modification time
+        self.entries: Dict[str, float] = {}
+        # Directory modification time of the last scan, a different one means the cache is stale
+        self.stamp: Optional[int] = None
+        # Changes are only reported once the directory was scanned a first time
+        self.scanned = False
+        # Called with (folder_type, event, name) for every change of the listing, whatever found it
+        self.listener: Optional[Callable[[str, str, str], None]] = None
+
+    def directory(self) -> str:
+        return get_directory_by_type(self.folder_type)
+
+    def refresh_if_stale(self):
+        stamp = directory_stamp(self.directory())
+        with self.lock:
+            if stamp is not None and stamp == self.stamp:
+                return
+        self.rescan()
+
+    def rescan(self) -> List[Tuple[str, str]]:
+        # Full scan of the directory, returns the (event, name) changes from the previous listing
+        directory = self.directory()
+        stamp = directory_stamp(directory)
+        entries = {}
+        if stamp is not None:
+            for entry in os.scandir(directory):
+                if entry.is_file() and not entry.name.endswith(TEMP_SUFFIX):
+                    entries[entry.name] = entry.stat().st_mtime
+        with self.lock:
+            previous = self.entries
+            self.entries = entries
+            self.stamp = stamp
+            scanned = self.scanned
+            self.scanned = True
+        if not scanned:
+            return []
+        changes = [("remove", name) for name in previous if name not in entries]
+        for name, mtime in entries.items():
+            if name not in previous:
+                changes.append(("add", name))
+            elif previous[name] != mtime:
+                changes.append(("modify", name))
+        for event, name in changes:
+            self.notify(event, name)
+        return changes
+
+    def names(self) -> List[str]:
+        self.refresh_if_stale()
+        with self.lock:
+            # Most recent first
+            return sorted(self.entries, key=lambda name: -self.entries[name])
+
+    def add(self, name: str, mtime: float, previous_stamp: Optional[int]):
+        # Record a file we wrote ourselves. If the cache was up to date before our write,
+        # adopt the new directory stamp so our own write does not trigger a full rescan.
+        with self.lock:
+            event = "modify" if name in self.entries else "add"
+            self.entries[name] = mtime
+            if previous_stamp is not None and previous_stamp == self.stamp:
+                self.stamp = directory_stamp(self.directory())
+        self.notify(event, name)
+
+    def apply(self, event: str, name: str) -> Optional[str]:
+        # Apply a change reported by a watcher. Returns the resulting event, or None when the
+        # change does not affect the listing. Watchers report every change, so the cache is
+        # considered up to date with the current directory stamp afterward.
+        directory = self.directory()
+        if event == "remove":
+            mtime = None
+        else:
+            try:
+                mtime = os.stat(os.path.join(directory, name)).st_mtime
+            except FileNotFoundError:
+                # Already gone, a remove event will follow
+                return None
+        with self.lock:
+            known = name in self.entries
+            if mtime is None:
+                if not known:
+                    return None
+                del self.entries[name]
+                result = "remove"
+            else:
+                self.entries[name] = mtime
+                result = "modify" if known else "add"
+            self.stamp = directory_stamp(directory)
+        self.notify(result, name)
+        return result
+
+    def notify(self, event: str, name: str):
+        if self.listener is not None and self.scanned:
+            self.listener(self.folder_type, event, name)
+
+
+listings = {
+    "input": DirectoryListing("input"),
+    "output": DirectoryListing("output"),
+}
@@ -0,0 +1,208 @@
+# pylint: disable=missing-module-docstring,disable=missing-class-docstring,missing-function-docstring,line-too-long
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import threading
+from typing import Callable, Dict, List, Optional
+
+from .image_listing import TEMP_SUFFIX, DirectoryListing, listings
+
+# Websocket event type sent to the clients
+EVENT_TYPE = "ig1.images"
+# Delay used to coalesce bursts of changes into a single message
+NOTIFY_DELAY = 0.25
+POLL_INTERVAL = 2.0
+
+# inotify(7) flags
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def display_name(folder_type: str, name: str) -> str:
+    # Same naming as the /ig1api/images listing
+    if folder_type == "output":
+        return name + " [output]"
+    return name
+
+
+class ChangesNotifier:
+    def __init__(self, send: Callable[[dict], None], delay: float = NOTIFY_DELAY):
+        self.send = send
+        self.delay = delay
+        self.lock = threading.Lock()
+        # Display name -> event, the last event of a name wins
+        self.changes: Dict[str, str] = {}
+        self.timer: Optional[threading.Timer] = None
+
+    def push(self, folder_type: str, event: str, name: str):
+        name = display_name(folder_type, name)
+        with self.lock:
+            previous = self.changes.get(name)
+            if previous == "add" and event == "remove":
+                # Never seen by the clients
+                del self.changes[name]
+            elif previous == "add" and event == "modify":
+                pass
+            elif previous == "remove" and event == "add":
+                self.changes[name] = "modify"
+            else:
+                self.changes[name] = event
+            self.schedule()
+
+    def schedule(self):
+        if self.timer is None:
+            self.timer = threading.Timer(self.delay, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            self.timer = None
+            if not self.changes:
+                return
+            message = {"changes": [{"event": event, "name": name} for name, event in self.changes.items()]}
+            self.changes = {}
+        try:
+            self.send(message)
+        except Exception as e:
+            print(f"IG1 images watcher failed to notify clients: {e}")
+
+
+def rescan(folder_type: str, listing: DirectoryListing):
+    try:
+        listing.rescan()
+    except Exception as e:
+        print(f"IG1 images watcher failed to scan {folder_type} directory: {e}")
+
+
+class InotifyWatcher:
+    def __init__(self, folders: Dict[str, DirectoryListing], on_lost: Callable[[Dict[str, DirectoryListing]], None]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches: Dict[int, str] = {}
+        for folder_type, listing in folders.items():
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(listing.directory()), WATCH_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed on {listing.directory()}")
+            self.watches[wd] = folder_type
+        self.folders = folders
+        # Called with the folders no longer watched, to keep reporting their changes another way
+        self.on_lost = on_lost
+
+    def start(self):
+        threading.Thread(target=self.run, name="ig1-inotify", daemon=True).start()
+
+    def run(self):
+        # Scan once the watches are in place, so no change is missed
+        for folder_type, listing in self.folders.items():
+            rescan(folder_type, listing)
+        while self.watches:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except OSError as e:
+                print(f"IG1 images watcher failed to read inotify events: {e}")
+                self.lose(list(self.watches))
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0").decode(errors="surrogateescape")
+                offset += length
+                try:
+                    self.handle(wd, mask, name)
+                except Exception as e:
+                    # One bad event (permission, vanished file...) must not stop the watcher
+                    print(f"IG1 images watcher failed to handle {name!r}: {e}")
+        os.close(self.fd)
+
+    def handle(self, wd: int, mask: int, name: str):
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost: a full rescan reports the differences
+            for folder_type in self.watches.values():
+                rescan(folder_type, self.folders[folder_type])
+            return
+        folder_type = self.watches.get(wd)
+        if folder_type is None:
+            return
+        if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+            # The watched directory itself is gone or moved: fall back to polling it
+            self.lose([wd])
+            return
+        if mask & IN_ISDIR or not name or name.endswith(TEMP_SUFFIX):
+            return
+        event = "remove" if mask & (IN_DELETE | IN_MOVED_FROM) else "modify"
+        self.folders[folder_type].apply(event, name)
+
+    def lose(self, wds: List[int]):
+        lost = {}
+        for wd in wds:
+            folder_type = self.watches.pop(wd, None)
+            if folder_type is not None:
+                lost[folder_type] = self.folders[folder_type]
+        if lost:
+            print(f"IG1 images watcher lost inotify watch on {', '.join(lost)} directory, polling it instead")
+            self.on_lost(lost)
+
+
+class PollingWatcher:
+    def __init__(self, folders: Dict[str, DirectoryListing], interval: float = POLL_INTERVAL):
+        self.folders = folders
+        self.interval = interval
+        self.stop = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self.run, name="ig1-polling", daemon=True).start()
+
+    def run(self):
+        for folder_type, listing in self.folders.items():
+            rescan(folder_type, listing)
+        # A single scan per interval for the whole server, whatever the number of clients.
+        # The listing reports the changes, including the ones found by a listing request in between.
+        while not self.stop.wait(self.interval):
+            for folder_type, listing in self.folders.items():
+                rescan(folder_type, listing)
+
+
+def start_watchers(send: Callable[[dict], None]) -> List[object]:
+    notifier = ChangesNotifier(send)
+    # The listings are the single source of changes: watchers, listing requests and saves all go through them
+    for listing in listings.values():
+        listing.listener = notifier.push
+    watchers = []
+
+    def poll(folders: Dict[str, DirectoryListing]):
+        watcher = PollingWatcher(folders)
+        watcher.start()
+        watchers.append(watcher)
+
+    polled = dict(listings)
+    if sys.platform.startswith("linux"):
+        watchable = {folder_type: listing for folder_type, listing in listings.items()
+                     if os.path.isdir(listing.directory())}
+        if watchable:
+            try:
+                watcher = InotifyWatcher(watchable, poll)
+                watcher.start()
+                watchers.append(watcher)
+                for folder_type in watchable:
+                    del polled[folder_type]
+            except (OSError, AttributeError) as e:
+                print(f"IG1 images watcher falling back to polling: {e}")
+    if polled:
+        poll(polled)
+    return watchers
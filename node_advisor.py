@@ -3,13 +3,41 @@ from comfy_api.latest import io
 
 from .helpers import Resolution, HIRES_RATIO
 from .node_utilities import ResolutionParam
-from .flux2 import get_best_valid_resolution as get_flux2_best_valid_resolution
-from .flux import get_best_valid_resolution as get_flux_best_valid_resolution
-from .qwenimage import get_best_valid_resolution as get_qwenimage_best_valid_resolution
-from .sdxl import get_best_valid_resolution as get_sdxl_best_valid_resolution
+from . import flux, flux2, qwenimage, sdxl
 
 models = ["FLUX.2-dev", "Qwen-Image", "FLUX.1-dev", "SDXL"]
 
+profiles = {
+    "FLUX.2-dev": flux2,
+    "Qwen-Image": qwenimage,
+    "FLUX.1-dev": flux,
+    "SDXL": sdxl,
+}
+
+
+def advise(resolution: Resolution, model: str, snap_to_native: bool = False) -> tuple[Resolution, bool, bool]:
+    profile = profiles.get(model)
+    if profile is None:
+        raise ValueError(f"Model {model} has no internal configuration.")
+    # Compute the first pass generation resolution
+    if snap_to_native:
+        generate_reso = profile.get_native_resolution(resolution)
+    else:
+        generate_reso = profile.get_best_valid_resolution(resolution)
+    # Compute if a HiRes fix x2 second pass is needed to get to the reference resolution
+    need_hires = False
+    need_upscale = False
+    if generate_reso.width < resolution.width or generate_reso.height < resolution.height:
+        need_hires = True
+        hires = Resolution(
+            width=generate_reso.width * HIRES_RATIO,
+            height=generate_reso.height * HIRES_RATIO
+        )
+        # And if a 3rd pass pure upscale is necessary post hires fix
+        if hires.width < resolution.width or hires.height < resolution.height:
+            need_upscale = True
+    return generate_reso, need_hires, need_upscale
+
 
 class ResolutionAdvisor(io.ComfyNode):
     @classmethod
@@ -19,7 +47,7 @@ class ResolutionAdvisor(io.ComfyNode):
             display_name="Resolution Advisor",
             category="IG1 Tools",
             description=f"""From a user input desired resolution, this node will compute and output:
-1. A first generation pass resolution, accounting for model's min len, max size and patch len, with a ratio the closest possible to input resolution.
+1. A first generation pass resolution, accounting for model's min len, max size and patch len, with a ratio the closest possible to input resolution. With snap to native, the model trained resolution with the nearest ratio is used instead.
 2. A boolean indicating if a second pass {HIRES_RATIO}x upscale (HiRes fix recommended) is necessary, aka if the generate resolution is lower than the reference resolution.
 3. A boolean indicating if a third pass (pure upscale) is necessary, aka if the the size post 2nd pass (doubling the resolution) is still under the reference resolution.
 """,
@@ -33,7 +61,12 @@ class ResolutionAdvisor(io.ComfyNode):
                     options=models,
                     default=models[0],
                     tooltip="The model you want to compute advises for. This will be used to get the patch length, min lengths and max size.",
-                )
+                ),
+                io.Boolean.Input(
+                    "snap_to_native",
+                    default=False,
+                    tooltip="Snap the generate resolution to the model trained resolution (bucket) with the nearest aspect ratio instead of computing a free one.",
+                ),
             ],
             outputs=[
                 ResolutionParam.Output(
@@ -56,31 +89,9 @@ class ResolutionAdvisor(io.ComfyNode):
         )
 
     @classmethod
-    def execute(cls, resolution, model) -> io.NodeOutput:
-        # Compute the flux first pass generation resolution
-        # and the adjusted (if necessary) reference resolution.
-        if model == "FLUX.2-dev":
-            generate_reso = get_flux2_best_valid_resolution(resolution)
-        elif model == "Qwen-Image":
-            generate_reso = get_qwenimage_best_valid_resolution(resolution)
-        elif model == "FLUX.1-dev":
-            generate_reso = get_flux_best_valid_resolution(resolution)
-        elif model == "SDXL":
-            generate_reso = get_sdxl_best_valid_resolution(resolution)
-        else:
-            ValueError(f"Model f{model} has no internal configuration.")
-        # Compute if a HiRes fix x2 second pass is needed to get to the reference resolution
-        need_hires = False
-        need_upscale = False
-        if generate_reso.width < resolution.width or generate_reso.height < resolution.height:
-            need_hires = True
-            hires = Resolution(
-                width=generate_reso.width * HIRES_RATIO,
-                height=generate_reso.height * HIRES_RATIO
-            )
-            # And if a 3rd pass pure upscale is necessary post hires fix
-            if hires.width < resolution.width or hires.height < resolution.height:
-                need_upscale = True
+    def execute(cls, resolution, model, snap_to_native=False) -> io.NodeOutput:
+        generate_reso, need_hires, need_upscale = advise(
+            resolution, model, snap_to_native)
         # Return to the user everything he needs for next steps
         return io.NodeOutput(
             generate_reso,
@@ -1,6 +1,5 @@
 # pylint: disable=missing-module-docstring,disable=missing-class-docstring,missing-function-docstring,line-too-long
 from comfy_api.latest import io
-import requests
 
 models = ["flux-2-dev", "flux-1-dev",
           "flux-1-kontext-dev", "flux-tools", "flux-1-krea-dev"]
@@ -45,6 +44,9 @@ class FluxReport(io.ComfyNode):
 
     @classmethod
     def execute(cls, image, model, api_key) -> io.NodeOutput:
+        # Imported on first use to keep the extension startup fast
+        import requests
+
         try:
             response = requests.post(
                 f"https://api.bfl.ai/v1/licenses/models/{model}/usage",
@@ -1,12 +1,26 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
 import folder_paths
-import node_helpers
 
-import numpy as np
-import torch
+from comfy_api.latest import io
 
-from PIL import Image, ImageOps, ImageSequence
+from .helpers import Resolution
+from .image_listing import TEMP_SUFFIX, directory_stamp, listings
+from .node_utilities import ResolutionParam
 
-from comfy_api.latest import io
+resize_methods = ["crop", "stretch"]
+
+save_formats = ["png", "webp", "jpeg"]
+SAVE_WORKERS = 2
+# Max images waiting to be encoded, the node blocks once reached to bound memory usage
+SAVE_MAX_PENDING = 16
+# Websocket event sent to the prompt client when background saves failed
+SAVE_FAILED_EVENT = "ig1.save_failed"
 
 
 class LoadImage(io.ComfyNode):
@@ -39,6 +53,12 @@ class LoadImage(io.ComfyNode):
 
     @classmethod
     def execute(cls, image) -> io.NodeOutput:
+        # Heavy dependencies are imported on first use to keep the extension startup fast
+        import node_helpers
+        import numpy as np
+        import torch
+        from PIL import Image, ImageOps, ImageSequence
+
         image_path = folder_paths.get_annotated_filepath(image)
 
         img = node_helpers.pillow(Image.open, image_path)
@@ -85,3 +105,307 @@ class LoadImage(io.ComfyNode):
             output_mask = output_masks[0]
 
         return (output_image, output_mask)
+
+
+def center_crop_box(width: int, height: int, target: Resolution) -> tuple[int, int, int, int]:
+    # Largest centered box of the source sharing the target aspect ratio
+    target_ratio = target.width / target.height
+    if width / height > target_ratio:
+        crop_width, crop_height = max(1, round(height * target_ratio)), height
+    else:
+        crop_width, crop_height = width, max(1, round(width / target_ratio))
+    return (width - crop_width) // 2, (height - crop_height) // 2, crop_width, crop_height
+
+
+class ResizeImage(io.ComfyNode):
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        return io.Schema(
+            node_id="IG1ResizeImage",
+            display_name="Resize Image to Resolution",
+            category="IG1 Tools",
+            description=f"""Resize an image batch to the exact resolution, either by center cropping to the target aspect ratio or by stretching.
+The batch is processed in chunks bounded by the memory cap, with antialiasing when downscaling. Use it as the final step after the advisor HiRes and upscale passes.""",
+            inputs=[
+                io.Image.Input(
+                    "image",
+                    tooltip="The image(s) to resize.",
+                ),
+                ResolutionParam.Input(
+                    "resolution",
+                    tooltip="The exact output resolution.",
+                ),
+                io.Combo.Input(
+                    "method",
+                    options=resize_methods,
+                    default=resize_methods[0],
+                    tooltip="crop keeps the image proportions and center crops the overflow, stretch resizes to the exact resolution regardless of proportions.",
+                ),
+                io.Int.Input(
+                    "max_memory_mb",
+                    tooltip="Memory cap (in MB) used to size the chunks of the batch processed at once.",
+                    min=64,
+                    default=1024,
+                    max=65536,
+                    display_mode=io.NumberDisplay.number,
+                ),
+            ],
+            outputs=[
+                io.Image.Output(
+                    "output_image",
+                    display_name="IMAGE",
+                    tooltip="The resized image(s).",
+                ),
+            ],
+        )
+
+    @classmethod
+    def execute(cls, image, resolution, method, max_memory_mb) -> io.NodeOutput:
+        import torch
+
+        batch, height, width, channels = image.shape
+        if method == "crop":
+            x, y, crop_width, crop_height = center_crop_box(
+                width, height, resolution)
+        else:
+            x, y, crop_width, crop_height = 0, 0, width, height
+        if crop_width == resolution.width and crop_height == resolution.height:
+            # Nothing to interpolate, the crop (a view) is already at the right size
+            return io.NodeOutput(image[:, y:y + crop_height, x:x + crop_width, :].contiguous())
+        # Chunk size: the channels first copy of the cropped source plus the resized result, in float32
+        per_image = (crop_width * crop_height + resolution.width * resolution.height) * channels * 4
+        chunk_size = max(1, (max_memory_mb * 1024 * 1024) // per_image)
+        downscale = resolution.width < crop_width or resolution.height < crop_height
+        output = torch.empty(
+            (batch, resolution.height, resolution.width, channels),
+            dtype=torch.float32,
+            device=image.device,
+        )
+        for start in range(0, batch, chunk_size):
+            end = min(start + chunk_size, batch)
+            # Cropping is a view: only the chunk gets copied by the channels first conversion
+            chunk = image[start:end, y:y + crop_height, x:x + crop_width, :].movedim(-1, 1)
+            resized = torch.nn.functional.interpolate(
+                chunk.float(),
+                size=(resolution.height, resolution.width),
+                mode="bicubic",
+                align_corners=False,
+                antialias=downscale,
+            )
+            output[start:end] = resized.movedim(1, -1).clamp_(0.0, 1.0)
+            del chunk, resized
+        return io.NodeOutput(output)
+
+
+class BackgroundSaver:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.executor: ThreadPoolExecutor | None = None
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        # Paths reserved by queued saves: not on disk yet, so unknown to ComfyUI counter computation
+        self.pending_paths: set[str] = set()
+
+    def reserve(self, folder: str, filename: str, counter: int, extension: str) -> tuple[str, str, int]:
+        with self.lock:
+            while True:
+                file = f"{filename}_{counter:05}_.{extension}"
+                path = os.path.join(folder, file)
+                if path not in self.pending_paths and not os.path.exists(path):
+                    break
+                counter += 1
+            self.pending_paths.add(path)
+        return file, path, counter
+
+    def submit(self, pixels, path: str, image_format: str, options: dict, listed: bool) -> Future:
+        # Wait for a free slot before queuing, bounding the encoded images kept in memory
+        self.slots.acquire()
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="ig1-save")
+        try:
+            return self.executor.submit(self.save, pixels, path,
+                                        image_format, options, listed)
+        except Exception:
+            self.release(path)
+            raise
+
+    def when_saved(self, futures: list[Future], results: list[dict], callback: Callable[[list[dict], list[str]], None]):
+        # Call back with the results of the successful saves and the failures once all of them are done
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            saved = [result for result, future in zip(results, futures) if future.result() is None]
+            failures = [future.result() for future in futures if future.result() is not None]
+            callback(saved, failures)
+
+        for future in futures:
+            future.add_done_callback(done)
+
+    def save(self, pixels, path: str, image_format: str, options: dict, listed: bool) -> str | None:
+        # Returns None once saved, or the failure message
+        from PIL import Image
+
+        directory, file = os.path.split(path)
+        temp_path = os.path.join(directory, f".{file}{TEMP_SUFFIX}")
+        try:
+            Image.fromarray(pixels).save(
+                temp_path, format=image_format, **options)
+            # Atomic publication: readers either see nothing or the complete file
+            previous_stamp = directory_stamp(directory)
+            os.replace(temp_path, path)
+            if listed:
+                listings["output"].add(
+                    file, os.stat(path).st_mtime, previous_stamp)
+            return None
+        except Exception as e:
+            logging.error(f"IG1 failed to save image {path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return f"{file}: {e}"
+        finally:
+            self.release(path)
+
+    def release(self, path: str):
+        with self.lock:
+            self.pending_paths.discard(path)
+        self.slots.release()
+
+
+background_saver = BackgroundSaver(SAVE_WORKERS, SAVE_MAX_PENDING)
+
+
+class SaveImage(io.ComfyNode):
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        return io.Schema(
+            node_id="IG1SaveImage",
+            display_name="Save image (background)",
+            category="IG1 Tools",
+            description=f"""Save images to the output folder, encoding them in the background so the next prompt can start right away.
+Files are written atomically and immediately listed by the Load input/output image node. Previews are shown once the files are written.
+A failed background save is reported to the client of the prompt that produced the image.""",
+            is_output_node=True,
+            inputs=[
+                io.Image.Input(
+                    "images",
+                    tooltip="The image(s) to save.",
+                ),
+                io.String.Input(
+                    "filename_prefix",
+                    default="ComfyUI",
+                    tooltip="The prefix for the file to save. This may include formatting information such as %date:yyyy-MM-dd% or %Empty Latent Image.width% to include values from nodes.",
+                ),
+                io.Combo.Input(
+                    "file_format",
+                    options=save_formats,
+                    default=save_formats[0],
+                    tooltip="The file format to encode the image(s) with.",
+                ),
+                io.Int.Input(
+                    "compress_level",
+                    tooltip="PNG compression level, lower is faster to encode but bigger.",
+                    min=0,
+                    default=4,
+                    max=9,
+                ),
+                io.Int.Input(
+                    "quality",
+                    tooltip="WebP and JPEG quality.",
+                    min=1,
+                    default=90,
+                    max=100,
+                ),
+            ],
+            hidden=[io.Hidden.prompt, io.Hidden.extra_pnginfo, io.Hidden.unique_id],
+        )
+
+    @classmethod
+    def execute(cls, images, filename_prefix, file_format, compress_level, quality) -> io.NodeOutput:
+        import numpy as np
+        from server import PromptServer
+
+        output_dir = folder_paths.get_output_directory()
+        full_output_folder, filename, counter, subfolder, filename_prefix = folder_paths.get_save_image_path(
+            filename_prefix, output_dir, images[0].shape[1], images[0].shape[0])
+        # Only the output folder root is listed by the loader
+        listed = os.path.realpath(full_output_folder) == os.path.realpath(
+            listings["output"].directory())
+        if file_format == "png":
+            image_format = "PNG"
+            options = {"compress_level": compress_level}
+            pnginfo = cls.png_info()
+            if pnginfo is not None:
+                options["pnginfo"] = pnginfo
+        elif file_format == "webp":
+            image_format = "WEBP"
+            options = {"quality": quality}
+        else:
+            image_format = "JPEG"
+            options = {"quality": quality}
+        results = []
+        futures = []
+        for batch_number, image in enumerate(images):
+            # Only the tensor to uint8 conversion happens on the execution thread
+            pixels = np.clip(255. * image.cpu().numpy(),
+                             0, 255).astype(np.uint8)
+            file, path, counter = background_saver.reserve(
+                full_output_folder,
+                filename.replace("%batch_num%", str(batch_number)),
+                counter,
+                file_format,
+            )
+            futures.append(background_saver.submit(
+                pixels, path, image_format, options, listed))
+            results.append(
+                {"filename": file, "subfolder": subfolder, "type": "output"})
+            counter += 1
+        # Files do not exist yet: previews are sent to the prompt client once they are written
+        server = PromptServer.instance
+        node_id = cls.hidden.unique_id
+        prompt_id = server.last_prompt_id
+        client_id = server.client_id
+
+        def notify_client(saved: list[dict], failures: list[str]):
+            if saved:
+                server.send_sync("executed", {
+                    "node": node_id,
+                    "display_node": node_id,
+                    "output": {"images": saved},
+                    "prompt_id": prompt_id,
+                }, client_id)
+            if failures:
+                # Reported to the prompt that produced the images, the node already returned
+                server.send_sync(SAVE_FAILED_EVENT, {
+                    "node": node_id,
+                    "prompt_id": prompt_id,
+                    "failures": failures,
+                }, client_id)
+
+        background_saver.when_saved(futures, results, notify_client)
+        # Not under "images": the frontend would fetch previews of files not written yet.
+        # The reserved names are still listed in the prompt /history outputs.
+        return io.NodeOutput(ui={"ig1_saved": results})
+
+    @classmethod
+    def png_info(cls):
+        from comfy.cli_args import args
+        from PIL.PngImagePlugin import PngInfo
+
+        if args.disable_metadata:
+            return None
+        if cls.hidden.prompt is None and cls.hidden.extra_pnginfo is None:
+            return None
+        metadata = PngInfo()
+        if cls.hidden.prompt is not None:
+            metadata.add_text("prompt", json.dumps(cls.hidden.prompt))
+        if cls.hidden.extra_pnginfo is not None:
+            for key, value in cls.hidden.extra_pnginfo.items():
+                metadata.add_text(key, json.dumps(value))
+        return metadata
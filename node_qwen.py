@@ -1,23 +1,10 @@
 from comfy_api.latest import io
 
-from .helpers import Resolution, ResolutionsList
 from .node_utilities import ResolutionParam
+from .qwenimage import native_resolutions
 
 
-# https://github.com/QwenLM/Qwen-Image/issues/7#issuecomment-3153364093
-training_resolutions = sorted(
-    [
-        Resolution(1328, 1328),
-        Resolution(1664, 928),
-        Resolution(928, 1664),
-        Resolution(1472, 1104),
-        Resolution(1104, 1472),
-        Resolution(1584, 1056),
-        Resolution(1056, 1584),
-    ],
-    key=lambda res: res.total_pixels(),
-    reverse=True,
-)
+training_resolutions = native_resolutions.resolutions
 
 
 class QwenImageNativesResolutions(io.ComfyNode):
@@ -47,9 +34,7 @@ class QwenImageNativesResolutions(io.ComfyNode):
 
     @classmethod
     def execute(cls, native_resolution) -> io.NodeOutput:
-        # Compute the flux first pass generation resolution
-        # and the adjusted (if necessary) reference resolution.
-        for res in training_resolutions:
-            if str(res) == native_resolution:
-                return io.NodeOutput(res)
-        raise ValueError(f"Unhandled resolution: {native_resolution}")
+        res = native_resolutions.get(native_resolution)
+        if res is None:
+            raise ValueError(f"Unhandled resolution: {native_resolution}")
+        return io.NodeOutput(res)
@@ -1,5 +1,7 @@
 # pylint: disable=missing-module-docstring,disable=missing-class-docstring,missing-function-docstring,line-too-long
-from .helpers import Resolution, generate_all_valid_resolutions
+from functools import cache
+
+from .helpers import Resolution, ResolutionsIndex, ResolutionsList, generate_all_valid_resolutions
 
 PATCH_LEN = 16  # VAE related
 MIN_LEN = 384  # is and must be dividable by PATCH_LEN
@@ -7,9 +9,26 @@ MIN_LEN = 384  # is and must be dividable by PATCH_LEN
 MAX_SIZE = 1328 * 1328
 
 
-# Precompute all valid resolutions
-all_valid_resolutions = generate_all_valid_resolutions(
-    PATCH_LEN, MIN_LEN, MAX_SIZE)
+# All valid resolutions, only computed on first use to keep startup fast
+@cache
+def get_all_valid_resolutions() -> ResolutionsList:
+    return generate_all_valid_resolutions(PATCH_LEN, MIN_LEN, MAX_SIZE)
+
+
+# https://github.com/QwenLM/Qwen-Image/issues/7#issuecomment-3153364093
+native_resolutions = ResolutionsIndex(sorted(
+    [
+        Resolution(1328, 1328),
+        Resolution(1664, 928),
+        Resolution(928, 1664),
+        Resolution(1472, 1104),
+        Resolution(1104, 1472),
+        Resolution(1584, 1056),
+        Resolution(1056, 1584),
+    ],
+    key=lambda res: res.total_pixels(),
+    reverse=True,
+))
 
 
 def get_best_valid_resolution(res: Resolution) -> Resolution:
@@ -17,4 +36,9 @@ def get_best_valid_resolution(res: Resolution) -> Resolution:
     if res.valid(patch_len=PATCH_LEN, min_len=MIN_LEN, max_size=MAX_SIZE):
         return res
     # Find the best one
-    return all_valid_resolutions.get_best_candidate(res)
+    return get_all_valid_resolutions().get_best_candidate(res)
+
+
+def get_native_resolution(res: Resolution) -> Resolution:
+    # Snap to the trained resolution with the nearest aspect ratio
+    return native_resolutions.get_nearest_ratio(res)
@@ -1,5 +1,7 @@
 # pylint: disable=missing-module-docstring,disable=missing-class-docstring,missing-function-docstring,line-too-long
-from .helpers import Resolution, generate_all_valid_resolutions
+from functools import cache
+
+from .helpers import Resolution, ResolutionsIndex, ResolutionsList, generate_all_valid_resolutions
 
 PATCH_LEN = 8  # VAE related
 MIN_LEN = 512
@@ -7,9 +9,24 @@ MIN_LEN = 512
 MAX_SIZE = 1024 * 1024
 
 
-# Precompute all valid resolutions
-all_valid_resolutions = generate_all_valid_resolutions(
-    PATCH_LEN, MIN_LEN, MAX_SIZE)
+# All valid resolutions, only computed on first use to keep startup fast
+@cache
+def get_all_valid_resolutions() -> ResolutionsList:
+    return generate_all_valid_resolutions(PATCH_LEN, MIN_LEN, MAX_SIZE)
+
+
+# SDXL multi aspect training buckets (see the SDXL technical report multi-aspect training)
+native_resolutions = ResolutionsIndex([
+    Resolution(1024, 1024),
+    Resolution(1152, 896),
+    Resolution(896, 1152),
+    Resolution(1216, 832),
+    Resolution(832, 1216),
+    Resolution(1344, 768),
+    Resolution(768, 1344),
+    Resolution(1536, 640),
+    Resolution(640, 1536),
+])
 
 
 def get_best_valid_resolution(res: Resolution) -> Resolution:
@@ -17,4 +34,9 @@ def get_best_valid_resolution(res: Resolution) -> Resolution:
     if res.valid(patch_len=PATCH_LEN, min_len=MIN_LEN, max_size=MAX_SIZE):
         return res
     # Find the best one
-    return all_valid_resolutions.get_best_candidate(res)
+    return get_all_valid_resolutions().get_best_candidate(res)
+
+
+def get_native_resolution(res: Resolution) -> Resolution:
+    # Snap to the trained resolution with the nearest aspect ratio
+    return native_resolutions.get_nearest_ratio(res)
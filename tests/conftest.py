@@ -0,0 +1,91 @@
+import importlib
+import json
+import sys
+import types
+
+import pytest
+
+
+class Anything:
+    # Stands for any ComfyUI object the node modules use at import time
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return Anything()
+
+    def __call__(self, *args, **kwargs):
+        return Anything()
+
+
+def stub_module(monkeypatch, name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    module.__getattr__ = lambda attribute: Anything()
+    monkeypatch.setitem(sys.modules, name, module)
+    return module
+
+
+@pytest.fixture
+def comfy_stubs(monkeypatch):
+    # Minimal comfy_api so that the node modules can be imported without ComfyUI
+    comfy_api = stub_module(monkeypatch, "comfy_api")
+    comfy_api.latest = stub_module(
+        monkeypatch, "comfy_api.latest",
+        io=stub_module(monkeypatch, "comfy_api.latest.io", ComfyNode=object),
+        ui=stub_module(monkeypatch, "comfy_api.latest.ui"),
+        ComfyExtension=object,
+    )
+    return comfy_api
+
+
+@pytest.fixture
+def node_advisor(comfy_stubs, monkeypatch):
+    for name in ("ig1_tools.node_utilities", "ig1_tools.node_advisor"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    return importlib.import_module("ig1_tools.node_advisor")
+
+
+class Response:
+    # Records what the handlers answer, in place of aiohttp.web.Response
+    def __init__(self, *, text=None, status=200, headers=None, content_type=None):
+        self.text = text
+        self.status = status
+        self.headers = dict(headers or {})
+        self.content_type = content_type
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def json_response(data, *, status=200, headers=None):
+    return Response(text=json.dumps(data), status=status, headers=headers, content_type="application/json")
+
+
+class Routes:
+    def _register(self, path):
+        return lambda handler: handler
+
+    get = post = _register
+
+
+@pytest.fixture
+def api_server(comfy_stubs, monkeypatch, tmp_path):
+    aiohttp = stub_module(monkeypatch, "aiohttp")
+    aiohttp.web = stub_module(monkeypatch, "aiohttp.web", Response=Response,
+                              json_response=json_response, Request=object)
+    stub_module(monkeypatch, "server", PromptServer=types.SimpleNamespace(
+        instance=types.SimpleNamespace(routes=Routes(), send_sync=lambda *args: None)))
+    stub_module(monkeypatch, "folder_paths", get_directory_by_type=lambda folder_type: str(tmp_path))
+    for name in ("ig1_tools.node_utilities", "ig1_tools.node_advisor", "ig1_tools.image_listing",
+                 "ig1_tools.image_watcher", "ig1_tools.api_server"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    return importlib.import_module("ig1_tools.api_server")
+
+
+@pytest.fixture
+def node_images(comfy_stubs, monkeypatch, tmp_path):
+    stub_module(monkeypatch, "folder_paths", get_directory_by_type=lambda folder_type: str(tmp_path))
+    for name in ("ig1_tools.node_utilities", "ig1_tools.image_listing", "ig1_tools.node_images"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    return importlib.import_module("ig1_tools.node_images")
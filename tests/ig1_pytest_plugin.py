@@ -0,0 +1,21 @@
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Register the extension folder as the ig1_tools package without running its __init__
+# (which needs a running ComfyUI), so that modules relying on relative imports load.
+if "ig1_tools" not in sys.modules:
+    package = types.ModuleType("ig1_tools")
+    package.__path__ = [str(ROOT)]
+    sys.modules["ig1_tools"] = package
+
+
+def pytest_collect_directory(path, parent):
+    # Collect the extension folder as a plain directory: as a package pytest would import its __init__
+    if path == ROOT:
+        return pytest.Dir.from_parent(parent, path=path)
+    return None
@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+
+
+class Query(dict):
+    # In place of aiohttp MultiDictProxy
+    def getall(self, key, default=None):
+        return self.get(key, default)
+
+
+class Request:
+    def __init__(self, query=None, headers=None, body=b""):
+        self.query = Query(query or {})
+        self.headers = headers or {}
+        self.body = body
+
+    async def json(self):
+        return json.loads(self.body.decode())
+
+
+def test_parse_advise_entry(api_server):
+    entry = {"model": "SDXL", "width": 1920, "height": 1080}
+    assert api_server.parse_advise_entry(entry) == ("SDXL", 1920, 1080, False)
+    assert api_server.parse_advise_entry({**entry, "snap_to_native": True})[3] is True
+
+
+@pytest.mark.parametrize("entry", [
+    ["SDXL", 1920, 1080],
+    {"model": "unknown", "width": 1920, "height": 1080},
+    {"model": "SDXL", "width": "1920", "height": 1080},
+    {"model": "SDXL", "width": True, "height": 1080},
+    {"model": "SDXL", "width": 0, "height": 1080},
+    {"model": "SDXL", "width": 1920, "height": 100000},
+    {"model": "SDXL", "width": 1920, "height": 1080, "snap_to_native": "yes"},
+])
+def test_parse_advise_entry_invalid(api_server, entry):
+    with pytest.raises(ValueError):
+        api_server.parse_advise_entry(entry)
+
+
+def test_parse_query_entries(api_server):
+    entries = api_server.parse_query_entries(Query(
+        model=["SDXL", "FLUX.1-dev"], width=["1920", "3840"], height=["1080", "2160"], snap_to_native=["true", "0"]))
+    assert entries == [
+        {"model": "SDXL", "width": 1920, "height": 1080, "snap_to_native": True},
+        {"model": "FLUX.1-dev", "width": 3840, "height": 2160, "snap_to_native": False},
+    ]
+
+
+@pytest.mark.parametrize("query", [
+    {},
+    {"model": ["SDXL"], "width": ["1920"]},
+    {"model": ["SDXL"], "width": ["wide"], "height": ["1080"]},
+    {"model": ["SDXL", "SDXL"], "width": ["1", "2"], "height": ["1", "2"], "snap_to_native": ["1"]},
+    {"model": ["SDXL"], "width": ["1920"], "height": ["1080"], "snap_to_native": ["maybe"]},
+])
+def test_parse_query_entries_invalid(api_server, query):
+    with pytest.raises(ValueError):
+        api_server.parse_query_entries(Query(query))
+
+
+def test_get_advise_etag(api_server):
+    query = {"model": ["FLUX.1-dev"], "width": ["3840"], "height": ["2160"]}
+    response = asyncio.run(api_server.get_advise(Request(query)))
+    assert response.status == 200
+    assert response.json()[0]["generate"] == {"width": 1280, "height": 720}
+    assert "max-age" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+    revalidated = asyncio.run(api_server.get_advise(Request(query, {"If-None-Match": etag})))
+    assert revalidated.status == 304
+    assert revalidated.headers["ETag"] == etag
+    weak = asyncio.run(api_server.get_advise(Request(query, {"If-None-Match": f'"other", W/{etag}'})))
+    assert weak.status == 304
+    other = asyncio.run(api_server.get_advise(Request(query, {"If-None-Match": '"other"'})))
+    assert other.status == 200
+
+
+def test_get_advise_invalid(api_server):
+    response = asyncio.run(api_server.get_advise(Request({"model": ["nope"], "width": ["1"], "height": ["1"]})))
+    assert response.status == 400
+    assert "error" in response.json()
+
+
+def test_post_advise(api_server):
+    body = json.dumps([{"model": "SDXL", "width": 1920, "height": 1080}]).encode()
+    response = asyncio.run(api_server.post_advise(Request(body=body, headers={"If-None-Match": "*"})))
+    # POST is never cached nor answered with 304
+    assert response.status == 200
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+    assert len(response.json()) == 1
+
+
+@pytest.mark.parametrize("body", [
+    b"not json",
+    b"\xff\xfe",
+    b'{"model": "SDXL"}',
+    b'[{"model": "SDXL", "width": 1}]',
+])
+def test_post_advise_invalid(api_server, body):
+    response = asyncio.run(api_server.post_advise(Request(body=body)))
+    assert response.status == 400
+
+
+def test_post_advise_too_many_entries(api_server):
+    entries = [{"model": "SDXL", "width": 1920, "height": 1080}] * (api_server.ADVISE_MAX_ENTRIES + 1)
+    response = asyncio.run(api_server.post_advise(Request(body=json.dumps(entries).encode())))
+    assert response.status == 400
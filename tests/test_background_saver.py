@@ -0,0 +1,24 @@
+from concurrent.futures import Future
+
+
+def test_when_saved_reports_saved_and_failed(node_images):
+    saver = node_images.BackgroundSaver(workers=1, max_pending=4)
+    futures = [Future() for _ in range(3)]
+    results = [{"filename": f"image_{index}.png"} for index in range(3)]
+    calls = []
+    saver.when_saved(futures, results, lambda saved, failures: calls.append((saved, failures)))
+    futures[0].set_result(None)
+    futures[2].set_result("image_2.png: disk full")
+    assert calls == []
+    futures[1].set_result(None)
+    # Called once, when every save of the execution is done
+    assert calls == [([results[0], results[1]], ["image_2.png: disk full"])]
+
+
+def test_reserve_skips_pending_and_existing_names(node_images, tmp_path):
+    saver = node_images.BackgroundSaver(workers=1, max_pending=4)
+    (tmp_path / "img_00001_.png").write_bytes(b"x")
+    first = saver.reserve(str(tmp_path), "img", 1, "png")
+    second = saver.reserve(str(tmp_path), "img", 1, "png")
+    assert first[0] == "img_00002_.png"
+    assert second[0] == "img_00003_.png"
@@ -0,0 +1,32 @@
+from ig1_tools import flux
+from ig1_tools.helpers import Resolution, plan_buckets
+
+
+def test_plan_buckets_respects_max_buckets():
+    targets = [Resolution(3840, 2160), Resolution(1080, 1920), Resolution(1000, 1000), Resolution(2000, 1000)]
+    for max_buckets in (1, 2, 3):
+        plans = plan_buckets(targets, max_buckets, flux.get_best_valid_resolution)
+        assert len(plans) == len(targets)
+        assert len({(plan.generate.width, plan.generate.height) for plan in plans}) <= max_buckets
+
+
+def test_plan_buckets_does_not_shrink_batch_for_odd_ratio():
+    targets = [
+        Resolution(3840, 2160),
+        Resolution(1920, 1200),
+        Resolution(1000, 1000),
+        Resolution(1920, 1080),
+        Resolution(1900, 1080),
+    ]
+    plans = plan_buckets(targets, 2, flux.get_best_valid_resolution)
+    for plan in plans:
+        # The 1900×1080 preferred resolution (816×464) must not drag the others down
+        assert plan.generate.total_pixels() >= 0.9 * flux.get_best_valid_resolution(plan.target).total_pixels()
+
+
+def test_bucket_assignment_crop_keeps_target_ratio():
+    plan = plan_buckets([Resolution(1920, 1080)], 1, lambda target: Resolution(1280, 800))[0]
+    assert (plan.crop.width, plan.crop.height) == (1280, 720)
+    assert (plan.crop_x, plan.crop_y) == (0, 40)
+    assert plan.need_crop()
+    assert plan.stretch() == (1.5, 1.35)
@@ -0,0 +1,45 @@
+import importlib
+import sys
+import types
+
+import pytest
+
+
+@pytest.fixture
+def listing(tmp_path, monkeypatch):
+    folder_paths = types.ModuleType("folder_paths")
+    folder_paths.get_directory_by_type = lambda folder_type: str(tmp_path)
+    monkeypatch.setitem(sys.modules, "folder_paths", folder_paths)
+    monkeypatch.delitem(sys.modules, "ig1_tools.image_listing", raising=False)
+    image_listing = importlib.import_module("ig1_tools.image_listing")
+    listing = image_listing.DirectoryListing("output")
+    listing.changes = []
+    listing.listener = lambda folder_type, event, name: listing.changes.append((event, name))
+    return listing
+
+
+def test_first_scan_is_silent(listing, tmp_path):
+    (tmp_path / "a.png").write_bytes(b"a")
+    assert listing.names() == ["a.png"]
+    assert listing.changes == []
+
+
+def test_listing_request_reports_changes(listing, tmp_path):
+    (tmp_path / "a.png").write_bytes(b"a")
+    listing.names()
+    (tmp_path / "a.png").unlink()
+    (tmp_path / "b.png").write_bytes(b"b")
+    (tmp_path / ".b.png.ig1tmp").write_bytes(b"b")
+    # A listing request finding the changes reports them, so a poller can not miss them afterward
+    assert listing.names() == ["b.png"]
+    assert sorted(listing.changes) == [("add", "b.png"), ("remove", "a.png")]
+    listing.changes.clear()
+    assert listing.rescan() == []
+    assert listing.changes == []
+
+
+def test_saved_file_is_reported(listing, tmp_path):
+    listing.names()
+    (tmp_path / "saved.png").write_bytes(b"s")
+    listing.add("saved.png", (tmp_path / "saved.png").stat().st_mtime, None)
+    assert listing.changes == [("add", "saved.png")]
@@ -0,0 +1,84 @@
+import importlib
+import sys
+import time
+import types
+
+import pytest
+
+
+@pytest.fixture
+def image_watcher(tmp_path, monkeypatch):
+    folder_paths = types.ModuleType("folder_paths")
+    folder_paths.get_directory_by_type = lambda folder_type: str(tmp_path / folder_type)
+    monkeypatch.setitem(sys.modules, "folder_paths", folder_paths)
+    for name in ("ig1_tools.image_listing", "ig1_tools.image_watcher"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    (tmp_path / "output").mkdir()
+    return importlib.import_module("ig1_tools.image_watcher")
+
+
+@pytest.fixture
+def output(image_watcher):
+    listing = image_watcher.DirectoryListing("output")
+    listing.changes = []
+    listing.listener = lambda folder_type, event, name: listing.changes.append((event, name))
+    return listing
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_survives_failing_event(image_watcher, output, tmp_path):
+    apply = output.apply
+
+    def failing_apply(event, name):
+        if name == "bad.png":
+            raise PermissionError("denied")
+        return apply(event, name)
+
+    output.apply = failing_apply
+    watcher = image_watcher.InotifyWatcher({"output": output}, lambda folders: None)
+    watcher.start()
+    assert wait_for(lambda: output.scanned)
+    (tmp_path / "output" / "bad.png").write_bytes(b"b")
+    (tmp_path / "output" / "good.png").write_bytes(b"g")
+    assert wait_for(lambda: ("add", "good.png") in output.changes)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_hands_lost_folder_to_poller(image_watcher, output, tmp_path):
+    lost = []
+    watcher = image_watcher.InotifyWatcher({"output": output}, lost.append)
+    watcher.start()
+    assert wait_for(lambda: output.scanned)
+    (tmp_path / "output").rename(tmp_path / "moved")
+    assert wait_for(lambda: lost == [{"output": output}])
+    assert not watcher.watches
+
+
+def test_polling_survives_failing_scan(image_watcher, output, tmp_path, monkeypatch):
+    rescan = output.rescan
+    calls = []
+
+    def failing_rescan():
+        calls.append(None)
+        if len(calls) == 2:
+            raise PermissionError("denied")
+        return rescan()
+
+    monkeypatch.setattr(output, "rescan", failing_rescan)
+    watcher = image_watcher.PollingWatcher({"output": output}, interval=0.01)
+    watcher.start()
+    try:
+        assert wait_for(lambda: len(calls) >= 3)
+        (tmp_path / "output" / "new.png").write_bytes(b"n")
+        assert wait_for(lambda: ("add", "new.png") in output.changes)
+    finally:
+        watcher.stop.set()
@@ -0,0 +1,99 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cold start budget of the extension import, with ComfyUI itself stubbed
+IMPORT_TIME_BUDGET = 0.5
+# Max number of modules the extension import may add on top of its own and the stubs
+IMPORT_MODULES_BUDGET = 40
+HEAVY_MODULES = ["torch", "numpy", "PIL", "requests"]
+
+IMPORT_SCRIPT = r"""
+import importlib.util
+import json
+import sys
+import tempfile
+import time
+import types
+
+
+class Anything:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return Anything()
+
+    def __call__(self, *args, **kwargs):
+        return Anything()
+
+
+def stub(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    module.__getattr__ = lambda attribute: Anything()
+    sys.modules[name] = module
+    return module
+
+
+class Routes:
+    def _register(self, path):
+        return lambda handler: handler
+
+    get = post = _register
+
+
+class PromptServer:
+    instance = types.SimpleNamespace(routes=Routes(), send_sync=lambda *args: None)
+
+
+directory = tempfile.mkdtemp()
+comfy_api = stub("comfy_api")
+comfy_api.latest = stub("comfy_api.latest", io=stub("comfy_api.latest.io", ComfyNode=object),
+                        ui=stub("comfy_api.latest.ui"), ComfyExtension=object)
+stub("folder_paths", get_directory_by_type=lambda folder_type: directory)
+stub("server", PromptServer=PromptServer)
+try:
+    import aiohttp.web
+except ImportError:
+    stub("aiohttp").web = stub("aiohttp.web")
+# Already loaded by ComfyUI (its server runs on aiohttp and asyncio) before custom nodes
+import asyncio
+import typing_extensions
+
+before = set(sys.modules)
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location(
+    "ig1_tools", sys.argv[1] + "/__init__.py", submodule_search_locations=[sys.argv[1]])
+module = importlib.util.module_from_spec(spec)
+sys.modules["ig1_tools"] = module
+spec.loader.exec_module(module)
+elapsed = time.perf_counter() - start
+added = [name for name in set(sys.modules) - before if not name.startswith("ig1_tools")]
+print(json.dumps({"elapsed": elapsed, "added": sorted(added)}))
+"""
+
+
+@pytest.fixture(scope="module")
+def import_report() -> dict:
+    # A single cold import shared by the budget tests
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT, str(ROOT)],
+        capture_output=True, text=True, check=True, timeout=60,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_time_budget(import_report):
+    assert import_report["elapsed"] < IMPORT_TIME_BUDGET, f"extension import took {import_report['elapsed']:.3f}s"
+
+
+def test_import_footprint_budget(import_report):
+    heavy = [name for name in import_report["added"] if name.split(".")[0] in HEAVY_MODULES]
+    assert not heavy, f"heavy modules imported at startup: {heavy}"
+    assert len(import_report["added"]) <= IMPORT_MODULES_BUDGET, f"extension import added {len(import_report['added'])} modules: {import_report['added']}"
@@ -0,0 +1,72 @@
+import pytest
+
+from ig1_tools import flux, flux2, qwenimage, sdxl
+from ig1_tools.helpers import COMMON_ASPECT_RATIOS, Resolution, ResolutionsIndex, generate_ratio_buckets
+
+
+def test_get_by_name():
+    index = qwenimage.native_resolutions
+    for res in index:
+        assert index.get(str(res)) is res
+        assert Resolution(res.width, res.height) in index
+    assert index.get("123×456") is None
+    assert Resolution(123, 456) not in index
+
+
+def test_nearest_ratio_exact_match():
+    assert sdxl.get_native_resolution(Resolution(2048, 2048)) == Resolution(1024, 1024)
+    assert sdxl.get_native_resolution(Resolution(1216, 832)) == Resolution(1216, 832)
+
+
+def test_nearest_ratio_ends_of_the_list():
+    # Ratios beyond the widest and the tallest buckets snap to them
+    assert sdxl.get_native_resolution(Resolution(8000, 1000)) == Resolution(1536, 640)
+    assert sdxl.get_native_resolution(Resolution(1000, 8000)) == Resolution(640, 1536)
+
+
+def test_nearest_ratio_between_buckets():
+    # 1.6 lies between 1216×832 (~1.46) and 1344×768 (1.75), closer to the first
+    assert sdxl.get_native_resolution(Resolution(1600, 1000)) == Resolution(1216, 832)
+
+
+def test_nearest_ratio_ties_pick_closest_equal_or_larger():
+    index = ResolutionsIndex([Resolution(512, 512), Resolution(1024, 1024), Resolution(1536, 768)])
+    assert index.get_nearest_ratio(Resolution(800, 800)) == Resolution(1024, 1024)
+    assert index.get_nearest_ratio(Resolution(400, 400)) == Resolution(512, 512)
+    # Bigger than every same ratio candidate: the closest one is taken
+    assert index.get_nearest_ratio(Resolution(4000, 4000)) == Resolution(1024, 1024)
+
+
+def test_nearest_ratio_empty_index():
+    assert ResolutionsIndex([]).get_nearest_ratio(Resolution(100, 100)) == Resolution(0, 0)
+
+
+@pytest.mark.parametrize("model", [flux, flux2])
+def test_derived_buckets_are_valid(model):
+    buckets = list(model.native_resolutions)
+    assert len(buckets) == len(COMMON_ASPECT_RATIOS)
+    for res in buckets:
+        assert res.valid(patch_len=model.PATCH_LEN, min_len=model.MIN_LEN, max_size=model.MAX_SIZE)
+
+
+def test_derived_buckets_follow_ratios():
+    buckets = generate_ratio_buckets(COMMON_ASPECT_RATIOS, 16, 320, 1024 * 1024)
+    for ratio, res in zip(COMMON_ASPECT_RATIOS, buckets):
+        assert abs(res.width / res.height - ratio.value()) < 0.05
+    assert Resolution(1024, 1024) in buckets
+    assert Resolution(1280, 720) in buckets
+
+
+def test_advise_snap_to_native(node_advisor):
+    advise = node_advisor.advise
+    generate, need_hires, need_upscale = advise(Resolution(3840, 2160), "SDXL", snap_to_native=True)
+    assert generate == Resolution(1344, 768)
+    assert need_hires and need_upscale
+    generate, need_hires, need_upscale = advise(Resolution(1024, 1024), "Qwen-Image", snap_to_native=True)
+    assert generate == Resolution(1328, 1328)
+    assert not need_hires and not need_upscale
+
+
+def test_advise_without_snap_uses_valid_resolution(node_advisor):
+    generate, _, _ = node_advisor.advise(Resolution(3840, 2160), "FLUX.1-dev")
+    assert generate == Resolution(1280, 720)
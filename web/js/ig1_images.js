@@ -0,0 +1,114 @@
+import { app } from "../../scripts/app.js";
+import { api } from "../../scripts/api.js";
+
+const OUTPUT_SUFFIX = " [output]";
+
+// Extension side images list shared by all the Load input/output image nodes.
+// Fetched once, then kept current by the deltas pushed by the server.
+let images = null;
+let loading = null;
+// Deltas received while the full list is being fetched
+let pendingChanges = [];
+
+// Apply the add/remove/modify deltas pushed by the server to the images list.
+// Like /ig1api/images: input images first then output images, most recent first.
+function applyChanges(values, changes) {
+    const removed = new Set(changes.map((change) => change.name));
+    const list = values.filter((name) => !removed.has(name));
+    for (const change of changes) {
+        if (change.event === "remove") {
+            continue;
+        }
+        if (change.name.endsWith(OUTPUT_SUFFIX)) {
+            const firstOutput = list.findIndex((name) => name.endsWith(OUTPUT_SUFFIX));
+            list.splice(firstOutput === -1 ? list.length : firstOutput, 0, change.name);
+        } else {
+            list.unshift(change.name);
+        }
+    }
+    return list;
+}
+
+function loadImages() {
+    loading ??= api.fetchApi("/ig1api/images")
+        .then((response) => response.json())
+        .then((values) => {
+            images = applyChanges(values, pendingChanges);
+            app.graph?.setDirtyCanvas(true);
+        })
+        .catch((e) => console.warn("IG1: failed to load the images list", e))
+        .finally(() => {
+            pendingChanges = [];
+            loading = null;
+        });
+    return loading;
+}
+
+// The shared list is the single source of the widget values: only loadImages() fetches it,
+// the remote widget own fetch (on first read and on refresh) is never triggered.
+function useSharedImages(widget) {
+    try {
+        Object.defineProperty(widget.options, "values", {
+            configurable: true,
+            enumerable: true,
+            get: () => images ?? [],
+            set: (values) => {
+                images = values;
+            },
+        });
+    } catch (e) {
+        console.warn("IG1: can not share the images list with the image widget", e);
+        return;
+    }
+    widget.refresh = async function () {
+        await loadImages();
+        // Same as the remote widget control_after_refresh "first"
+        if (images?.length) {
+            widget.value = images[0];
+            widget.callback?.(widget.value);
+        }
+    };
+}
+
+app.registerExtension({
+    name: "IG1.Images",
+    async nodeCreated(node) {
+        if (node.comfyClass !== "IG1LoadImage") {
+            return;
+        }
+        const widget = node.widgets?.find((w) => w.name === "image");
+        if (!widget) {
+            return;
+        }
+        useSharedImages(widget);
+        if (images === null) {
+            loadImages();
+        }
+    },
+    async setup() {
+        // Background saves failing after the Save image (background) node returned
+        api.addEventListener("ig1.save_failed", ({ detail }) => {
+            const message = `Failed to save image(s): ${detail.failures.join("; ")}`;
+            console.error(`IG1 (prompt ${detail.prompt_id}, node ${detail.node}): ${message}`);
+            const toast = app.extensionManager?.toast;
+            if (toast) {
+                toast.add({ severity: "error", summary: "IG1 Save image", detail: message });
+            } else {
+                alert(message);
+            }
+        });
+        api.addEventListener("ig1.images", ({ detail }) => {
+            const changes = detail.changes ?? [];
+            if (loading) {
+                pendingChanges.push(...changes);
+                return;
+            }
+            if (images === null) {
+                // No node uses the list yet: it will be fetched when needed
+                return;
+            }
+            images = applyChanges(images, changes);
+            app.graph?.setDirtyCanvas(true);
+        });
+    },
+});